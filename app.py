@@ -1,8 +1,13 @@
+import os
+import time
+import uuid
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.text_extractor import TextExtractor as te
 from utils.detector import RedFlagDetector as re
+from utils.worker_pool import ReplicaPool
+from utils.ocr_pipeline import OcrInferencePipeline as ocr
+from utils.analysis_store import AnalysisStore
 
 # Set Page Settings
 st.set_page_config(
@@ -36,6 +41,21 @@ st.markdown(
     unsafe_allow_html = True
 )
 
+# Inference worker pool (set CUPID_WORKERS >= 1 to run model replicas in a separate host process)
+@st.cache_resource
+def get_pool():
+    workers = int(os.environ.get("CUPID_WORKERS", "0"))
+    return ReplicaPool(workers) if workers >= 1 else None
+
+pool = get_pool()
+
+# Persistent analysis history (SQLite, see utils/analysis_store.py)
+@st.cache_resource
+def get_store():
+    return AnalysisStore(os.environ.get("CUPID_DB", "analysis.db"))
+
+store = get_store()
+
 # Add title, header & threshold
 st.title('Cupid\'s Therapist 💘')
 st.header("AI-Powered Dating App Red Flag Detector", divider="red")
@@ -46,6 +66,8 @@ chat_container = st.container(height=300, border=True)
 # Initialize Message History 
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
 # Display Chat History
 with chat_container:
@@ -96,16 +118,20 @@ if prompt:
                 for image in prompt.files:
                     st.image(image) 
 
-                    # Extract text & append it to the prompt
-                    text = te.extract_text_from_image(image)
-                    combined_text += f" {text}"   
-
         # Add Image to History
         st.session_state.messages.append({"role": "user", "type": "image", "content": prompt["files"]})
 
     # Get average red flag score and results
+    start = time.perf_counter()
+    if prompt.files:
+        # OCR the screenshots while already scoring the text read so far
+        results_df, is_red_flag, combined_text = ocr.get_results(combined_text, prompt.files, threshold, pool=pool)
+    else:
+        results_df, is_red_flag = re.get_results(combined_text, threshold, pool=pool)
     print(f"prompt {combined_text}")
-    results_df, is_red_flag = re.get_results(combined_text, threshold)
+    # A prompt with no clauses has nothing scored (every label average is NaN)
+    if re.split_clauses(combined_text):
+        store.record(st.session_state.session_id, combined_text, results_df, is_red_flag, threshold, (time.perf_counter() - start) * 1000)
     results_df= pd.DataFrame(results_df, columns=["Flag", "Scores"])
 
 
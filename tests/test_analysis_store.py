@@ -0,0 +1,44 @@
+from utils.analysis_store import AnalysisStore
+
+
+def make_store(tmp_path):
+    return AnalysisStore(str(tmp_path / "analysis.db"))
+
+
+def test_record_without_scored_clauses(tmp_path):
+    # An empty prompt averages no scores, so every label comes out NaN
+    store = make_store(tmp_path)
+    store.record("s", "...", [("a", float("nan")), ("b", float("nan"))], False, 0.3, 1.0)
+
+    assert store.session_stats("s")["analyses"] == 1
+    assert store.recent("s")[0]["max_score"] == 0.0
+    assert store.label_stats() == []
+    store.close()
+
+
+def test_record_skips_only_non_finite_scores(tmp_path):
+    store = make_store(tmp_path)
+    store.record("s", "t", [("a", 0.4), ("b", float("nan"))], True, 0.3, 1.0)
+
+    assert store.recent("s")[0]["max_score"] == 0.4
+    assert [row["label"] for row in store.label_stats()] == ["a"]
+    store.close()
+
+
+def test_hash_text_on_instance(tmp_path):
+    store = make_store(tmp_path)
+    assert store.hash_text("x") == AnalysisStore.hash_text("x")
+    assert store.hash_text(None) == store.hash_text("")
+    store.close()
+
+
+def test_session_range_with_out_of_order_rows(tmp_path):
+    store = make_store(tmp_path)
+    store.record_many([
+        ("s", "t", [("a", 0.1)], False, 0.3, 1.0, 100.0),
+        ("s", "t", [("a", 0.1)], False, 0.3, 1.0, 50.0),
+    ])
+
+    stats = store.session_stats("s")
+    assert (stats["first_at"], stats["last_at"]) == (50.0, 100.0)
+    store.close()
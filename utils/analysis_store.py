@@ -0,0 +1,221 @@
+import math
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id          INTEGER PRIMARY KEY,
+    session_id  TEXT    NOT NULL,
+    created_at  REAL    NOT NULL,
+    text_hash   TEXT    NOT NULL,
+    is_red_flag INTEGER NOT NULL,
+    threshold   REAL    NOT NULL,
+    max_score   REAL    NOT NULL,
+    elapsed_ms  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_session_time ON analyses (session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_time ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_text_hash ON analyses (text_hash);
+
+CREATE TABLE IF NOT EXISTS analysis_scores (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    label       TEXT    NOT NULL,
+    score       REAL    NOT NULL,
+    PRIMARY KEY (analysis_id, label)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_scores_label_score ON analysis_scores (label, score);
+
+-- Aggregates, kept up to date by the triggers below so stats are a single row read
+CREATE TABLE IF NOT EXISTS totals (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    analyses    INTEGER NOT NULL,
+    red_flags   INTEGER NOT NULL,
+    elapsed_ms  REAL    NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (1, 0, 0, 0.0);
+
+CREATE TABLE IF NOT EXISTS session_stats (
+    session_id  TEXT    PRIMARY KEY,
+    analyses    INTEGER NOT NULL,
+    red_flags   INTEGER NOT NULL,
+    first_at    REAL    NOT NULL,
+    last_at     REAL    NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day         TEXT    PRIMARY KEY,
+    analyses    INTEGER NOT NULL,
+    red_flags   INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS label_stats (
+    label       TEXT    PRIMARY KEY,
+    n           INTEGER NOT NULL,
+    score_sum   REAL    NOT NULL,
+    max_score   REAL    NOT NULL
+);
+
+-- Triggers are recreated on every open so existing databases pick up fixes
+DROP TRIGGER IF EXISTS trg_analyses_insert;
+CREATE TRIGGER trg_analyses_insert AFTER INSERT ON analyses
+BEGIN
+    UPDATE totals SET
+        analyses = analyses + 1,
+        red_flags = red_flags + NEW.is_red_flag,
+        elapsed_ms = elapsed_ms + NEW.elapsed_ms
+    WHERE id = 1;
+
+    INSERT INTO session_stats VALUES (NEW.session_id, 1, NEW.is_red_flag, NEW.created_at, NEW.created_at)
+    ON CONFLICT (session_id) DO UPDATE SET
+        analyses = analyses + 1,
+        red_flags = red_flags + excluded.red_flags,
+        first_at = MIN(first_at, excluded.first_at),
+        last_at = MAX(last_at, excluded.last_at);
+
+    INSERT INTO daily_stats VALUES (date(NEW.created_at, 'unixepoch'), 1, NEW.is_red_flag)
+    ON CONFLICT (day) DO UPDATE SET
+        analyses = analyses + 1,
+        red_flags = red_flags + excluded.red_flags;
+END;
+
+DROP TRIGGER IF EXISTS trg_scores_insert;
+CREATE TRIGGER trg_scores_insert AFTER INSERT ON analysis_scores
+BEGIN
+    INSERT INTO label_stats VALUES (NEW.label, 1, NEW.score, NEW.score)
+    ON CONFLICT (label) DO UPDATE SET
+        n = n + 1,
+        score_sum = score_sum + excluded.score_sum,
+        max_score = MAX(max_score, excluded.max_score);
+END;
+"""
+
+
+class AnalysisStore:
+    """
+    Persistent local history of analyses (SQLite, WAL mode).
+
+    record() writes its analysis in its own transaction before returning, so
+    nothing is held in memory and other processes see it straight away.
+    record_many() writes a batch of analyses in a single transaction.
+    """
+
+    def __init__(self, path):
+        # One database per app: each app writes its own label set into label_stats
+        self.path = path
+
+        # Streamlit reruns the script on different threads, guarded by _lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+        atexit.register(self.close)
+
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+    def record(self, session_id, text, scores, is_red_flag, threshold, elapsed_ms, created_at=None):
+        # scores: iterable of (label, score) pairs; non-finite scores are not stored
+        self.record_many([(session_id, text, scores, is_red_flag, threshold, elapsed_ms, created_at)])
+
+    def record_many(self, analyses):
+        # analyses: iterable of record() argument tuples, written in one transaction
+        rows = []
+        for session_id, text, scores, is_red_flag, threshold, elapsed_ms, created_at in analyses:
+            scores = [(label, float(score)) for label, score in scores if math.isfinite(float(score))]
+            row = (
+                session_id,
+                created_at if created_at is not None else time.time(),
+                AnalysisStore.hash_text(text),
+                int(bool(is_red_flag)),
+                float(threshold),
+                max((s for _, s in scores), default=0.0),
+                float(elapsed_ms),
+            )
+            rows.append((row, scores))
+
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            for row, scores in rows:
+                cur.execute(
+                    "INSERT INTO analyses (session_id, created_at, text_hash, is_red_flag, threshold, max_score, elapsed_ms)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                analysis_id = cur.lastrowid
+                cur.executemany(
+                    "INSERT INTO analysis_scores (analysis_id, label, score) VALUES (?, ?, ?)",
+                    [(analysis_id, label, score) for label, score in scores],
+                )
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def session_stats(self, session_id):
+        rows = self._query(
+            "SELECT analyses, red_flags, first_at, last_at FROM session_stats WHERE session_id = ?",
+            (session_id,),
+        )
+        if not rows:
+            return {"analyses": 0, "red_flags": 0, "first_at": None, "last_at": None}
+        analyses, red_flags, first_at, last_at = rows[0]
+        return {"analyses": analyses, "red_flags": red_flags, "first_at": first_at, "last_at": last_at}
+
+    def totals(self):
+        analyses, red_flags, elapsed_ms = self._query(
+            "SELECT analyses, red_flags, elapsed_ms FROM totals WHERE id = 1"
+        )[0]
+        return {
+            "analyses": analyses,
+            "red_flags": red_flags,
+            "avg_ms": elapsed_ms / analyses if analyses else 0.0,
+        }
+
+    def label_stats(self):
+        rows = self._query("SELECT label, n, score_sum, max_score FROM label_stats ORDER BY label")
+        return [
+            {"label": label, "count": n, "avg_score": score_sum / n, "max_score": max_score}
+            for label, n, score_sum, max_score in rows
+        ]
+
+    def daily_stats(self, since_day=None):
+        rows = self._query(
+            "SELECT day, analyses, red_flags FROM daily_stats WHERE day >= ? ORDER BY day",
+            (since_day or "",),
+        )
+        return [{"day": day, "analyses": a, "red_flags": r} for day, a, r in rows]
+
+    def recent(self, session_id, limit=6):
+        rows = self._query(
+            "SELECT id, created_at, text_hash, is_red_flag, max_score, elapsed_ms FROM analyses"
+            " WHERE session_id = ? ORDER BY created_at DESC LIMIT ?",
+            (session_id, limit),
+        )
+        keys = ("id", "created_at", "text_hash", "is_red_flag", "max_score", "elapsed_ms")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def top_by_label(self, label, min_score=0.0, limit=10):
+        # Served by idx_scores_label_score
+        rows = self._query(
+            "SELECT analysis_id, score FROM analysis_scores"
+            " WHERE label = ? AND score >= ? ORDER BY score DESC LIMIT ?",
+            (label, min_score, limit),
+        )
+        return [{"analysis_id": a, "score": s} for a, s in rows]
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.close()
+            self._conn = None
@@ -4,89 +4,99 @@ from transformers import pipeline
 import re
 
 class RedFlagDetector:
-    def get_results(prompt, threshold):
-        # -----------------------------
-        # Labels with definitions
-        # -----------------------------
-        labels = [
-            "emotionally manipulative behavior: using guilt, fear, or insecurity to manipulate or influence someone",
-            "gaslighting or reality distortion: causing someone to doubt their memory, perception, or feelings",
-            "verbal abuse or insults: using words to belittle, demean, or shame another person",
-            "love bombing or excessive reassurance: repeatedly giving affection, compliments, or reassurance to elicit trust or attachment",
-            "blame shifting responsibility: deflecting responsibility by blaming others for one's own actions",
-            "controlling or possessive behavior: monitoring, restricting, or isolating someone's activities, independance, decisions or social interactions"
-        ]
-
-        # -----------------------------
-        # Hypothesis templates
-        # -----------------------------
-        templates = [
-            "This message shows signs of {}.",
-            "The speaker is engaging in {}.",
-            "This message demonstrates {} behavior.",
-            "The text contains {}."
-        ]
-
-        # -----------------------------
-        # Keyword boosting rules
-        # -----------------------------
-        keyword_boosts = {
-            "love bombing or excessive reassurance": [r"\bcan[’']?t live without you\b", r"\byou('?re| are) my everything\b", r"\bonly you understand me\b", r"\bi need you (all the time|always)\b"],
-            "blame shifting responsibility": [r"\byou made me\b", r"\bit's your fault\b", r"\byou caused\b", r"\byou always\b", r"\byou never\b"],
-            "emotionally manipulative behavior": [r"\byou should feel\b", r"\byou owe me\b", r"\byou must\b", r"\bnothing without me\b", r"\bworthless\b"],
-            "gaslighting or reality distortion": [r"\byou're imagining\b", r"\byou don't remember\b", r"\byou're dramatic\b", r"\bkill myself\b", r"\bnothing without me\b"],
-            "verbal abuse or insults": [r"\bstupid\b", r"\bidiot\b", r"\bfool\b", r"\bbitch\b", r"\bhoe\b", r"\bfuck\b", r"\bworthless\b"],
-            "controlling or possessive behavior": [r"\byou can't go\b", r"\bmust stay\b", r"\ball yours\b", r"\bnot allowed\b", r"\bonly mine\b", r"\bleave me\b"]
-        }
-
-        # -----------------------------
-        # Split text into clauses
-        # -----------------------------
-        clauses = re.split(r'[.,;]\s*', prompt)
-        clauses = [c.strip() for c in clauses if c.strip()]
-
+    # -----------------------------
+    # Labels with definitions
+    # -----------------------------
+    labels = [
+        "emotionally manipulative behavior: using guilt, fear, or insecurity to manipulate or influence someone",
+        "gaslighting or reality distortion: causing someone to doubt their memory, perception, or feelings",
+        "verbal abuse or insults: using words to belittle, demean, or shame another person",
+        "love bombing or excessive reassurance: repeatedly giving affection, compliments, or reassurance to elicit trust or attachment",
+        "blame shifting responsibility: deflecting responsibility by blaming others for one's own actions",
+        "controlling or possessive behavior: monitoring, restricting, or isolating someone's activities, independance, decisions or social interactions"
+    ]
+
+    # -----------------------------
+    # Hypothesis templates
+    # -----------------------------
+    templates = [
+        "This message shows signs of {}.",
+        "The speaker is engaging in {}.",
+        "This message demonstrates {} behavior.",
+        "The text contains {}."
+    ]
+
+    # -----------------------------
+    # Keyword boosting rules
+    # -----------------------------
+    keyword_boosts = {
+        "love bombing or excessive reassurance": [r"\bcan[’']?t live without you\b", r"\byou('?re| are) my everything\b", r"\bonly you understand me\b", r"\bi need you (all the time|always)\b"],
+        "blame shifting responsibility": [r"\byou made me\b", r"\bit's your fault\b", r"\byou caused\b", r"\byou always\b", r"\byou never\b"],
+        "emotionally manipulative behavior": [r"\byou should feel\b", r"\byou owe me\b", r"\byou must\b", r"\bnothing without me\b", r"\bworthless\b"],
+        "gaslighting or reality distortion": [r"\byou're imagining\b", r"\byou don't remember\b", r"\byou're dramatic\b", r"\bkill myself\b", r"\bnothing without me\b"],
+        "verbal abuse or insults": [r"\bstupid\b", r"\bidiot\b", r"\bfool\b", r"\bbitch\b", r"\bhoe\b", r"\bfuck\b", r"\bworthless\b"],
+        "controlling or possessive behavior": [r"\byou can't go\b", r"\bmust stay\b", r"\ball yours\b", r"\bnot allowed\b", r"\bonly mine\b", r"\bleave me\b"]
+    }
+
+    #shortened label names shown in the results table
+    concat_labels = ["Emotionally Manipulative Behavior", "Gaslighting or Reality Distortion", "Verbal Abuse or Insults", "Love Bombing or Excessive Reassurance", "Blame Shifting Responsibility", "Controlling or Possessive Behavior"]
+
+    model_name = "MoritzLaurer/deberta-v3-large-zeroshot-v2.0"
+
+    def load_classifier(device=None):
         # -----------------------------
         # Device setup
         # -----------------------------
-        device = 0 if torch.cuda.is_available() else -1
+        if device is None:
+            device = 0 if torch.cuda.is_available() else -1
 
         # -----------------------------
         # Zero-shot classifier
         # -----------------------------
-        classifier = pipeline(
+        return pipeline(
             "zero-shot-classification",
-            model="MoritzLaurer/deberta-v3-large-zeroshot-v2.0",
+            model=RedFlagDetector.model_name,
             device=device
         )
 
-        # -----------------------------
-        # Scoring each label independently
-        # -----------------------------
+    def split_clauses(prompt):
+        clauses = re.split(r'[.,;]\s*', prompt)
+        return [c.strip() for c in clauses if c.strip()]
+
+    def make_jobs(clauses):
+        # One (label, template, clause) job per forward pass, in scoring order
+        return [
+            (label, template, clause)
+            for label in RedFlagDetector.labels
+            for template in RedFlagDetector.templates
+            for clause in clauses
+        ]
+
+    def score_job(classifier, job):
+        label, template, clause = job
+        result = classifier([clause], [label], hypothesis_template=template, multi_label=True)
+        if isinstance(result, list):
+            result = result[0]
+        return result["scores"][0]  # Only one label
+
+    def aggregate(prompt, label_scores, threshold):
+        # label_scores: one list of template x clause scores per label, in label order
         final_results = []
 
-        for label in labels:
+        for label, scores in zip(RedFlagDetector.labels, label_scores):
             label_name = label.split(":", 1)[0].strip()
-            label_scores = []
-
-            # Score every template + clause
-            for template in templates:
-                for clause in clauses:
-                    result = classifier([clause], [label], hypothesis_template=template, multi_label=True)
-                    if isinstance(result, list):
-                        result = result[0]
-                    label_scores.append(result["scores"][0])  # Only one label
 
             # Average score
-            avg_score = np.mean(label_scores)
+            avg_score = np.mean(scores)
 
             # Keyword boosting
-            if label_name in keyword_boosts:
-                for kw_pattern in keyword_boosts[label_name]:
+            if label_name in RedFlagDetector.keyword_boosts:
+                for kw_pattern in RedFlagDetector.keyword_boosts[label_name]:
                     if re.search(kw_pattern, prompt, re.I):
                         avg_score = max(avg_score, 0.2)  # adjust boost as needed
 
             final_results.append((label, avg_score))
-        
+
         # Check if red flag
         is_red_flag = False
         for label, score in final_results:
@@ -94,15 +104,34 @@ class RedFlagDetector:
                 is_red_flag = True
 
         #shortens label names and rounds scores to two decimals
-        concat_labels = ["Emotionally Manipulative Behavior", "Gaslighting or Reality Distortion", "Verbal Abuse or Insults", "Love Bombing or Excessive Reassurance", "Blame Shifting Responsibility", "Controlling or Possessive Behavior"]
+        concat_labels = RedFlagDetector.concat_labels
         for i in range(len(concat_labels)):
-            final_results[i] = (concat_labels[i], final_results[i][1]) 
-
+            final_results[i] = (concat_labels[i], final_results[i][1])
 
+        # -----------------------------
+        # Sort results descending
+        # -----------------------------
+        final_results.sort(key=lambda x: x[1], reverse=True)
+        return final_results, is_red_flag
 
+    def get_results(prompt, threshold, pool=None):
+        # -----------------------------
+        # Split text into clauses
+        # -----------------------------
+        clauses = RedFlagDetector.split_clauses(prompt)
+        jobs = RedFlagDetector.make_jobs(clauses)
 
         # -----------------------------
-        # Sort results descending
+        # Scoring each label independently
         # -----------------------------
-        final_results.sort(key=lambda x: x[1], reverse=True)   
-        return final_results, is_red_flag
\ No newline at end of file
+        if pool is not None:
+            # Spread the forwards across the forked replicas (see utils/worker_pool.py)
+            scores = pool.score(jobs)
+        else:
+            classifier = RedFlagDetector.load_classifier()
+            scores = [RedFlagDetector.score_job(classifier, job) for job in jobs]
+
+        per_label = len(RedFlagDetector.templates) * len(clauses)
+        label_scores = [scores[i * per_label:(i + 1) * per_label] for i in range(len(RedFlagDetector.labels))]
+
+        return RedFlagDetector.aggregate(prompt, label_scores, threshold)
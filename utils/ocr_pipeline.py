@@ -0,0 +1,116 @@
+import re
+import queue
+import threading
+
+from utils.text_extractor import TextExtractor
+from utils.detector import RedFlagDetector
+
+_DONE = object()
+
+
+class OcrInferencePipeline:
+    """
+    Overlaps OCR and model inference for multi-image prompts.
+
+    OCR thread  --(text queue)-->  clause splitter  --(clause queue)-->  inference thread
+
+    Clauses are scored as soon as the image they come from has been read,
+    and the final aggregation reproduces RedFlagDetector.get_results on the
+    fully combined text.
+    """
+
+    def get_results(text, images, threshold, pool=None, queue_size=2):
+        text_queue = queue.Queue(maxsize=queue_size)
+        clause_queue = queue.Queue(maxsize=queue_size * 4)
+        clause_scores = {}
+        errors = []
+
+        # -----------------------------
+        # Producer: OCR each image in order
+        # -----------------------------
+        def ocr_worker():
+            try:
+                for image in images:
+                    extracted = TextExtractor.extract_text_from_image(image)
+                    text_queue.put(f" {extracted}")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                text_queue.put(_DONE)
+
+        # -----------------------------
+        # Consumer: score each clause for every label/template
+        # -----------------------------
+        def inference_worker():
+            classifier = None
+            while True:
+                item = clause_queue.get()
+                if item is _DONE:
+                    return
+                if errors:
+                    continue  # keep draining so the splitter never blocks
+                index, clause = item
+                try:
+                    jobs = RedFlagDetector.make_jobs([clause])
+                    if pool is not None:
+                        clause_scores[index] = pool.score(jobs)
+                    else:
+                        if classifier is None:
+                            classifier = RedFlagDetector.load_classifier()
+                        clause_scores[index] = [RedFlagDetector.score_job(classifier, job) for job in jobs]
+                except Exception as e:
+                    errors.append(e)
+
+        ocr_thread = threading.Thread(target=ocr_worker, daemon=True)
+        inference_thread = threading.Thread(target=inference_worker, daemon=True)
+        ocr_thread.start()
+        inference_thread.start()
+
+        # -----------------------------
+        # Split the text stream into clauses
+        # -----------------------------
+        # The last fragment of a segment may continue into the next one, so it
+        # is carried over until a delimiter (or the end of input) closes it.
+        segments = [text or ""]
+        carry = ""
+        n_clauses = 0
+
+        def dispatch(fragments):
+            nonlocal n_clauses
+            for fragment in fragments:
+                clause = fragment.strip()
+                if clause:
+                    clause_queue.put((n_clauses, clause))
+                    n_clauses += 1
+
+        segment = segments[0]
+        while True:
+            parts = re.split(r'[.,;]\s*', carry + segment)
+            carry = parts.pop()
+            dispatch(parts)
+
+            segment = text_queue.get()
+            if segment is _DONE:
+                break
+            segments.append(segment)
+
+        dispatch([carry])
+        clause_queue.put(_DONE)
+
+        ocr_thread.join()
+        inference_thread.join()
+        if errors:
+            raise errors[0]
+
+        # -----------------------------
+        # Aggregate in the sequential scoring order
+        # -----------------------------
+        n_templates = len(RedFlagDetector.templates)
+        label_scores = [
+            [clause_scores[c][l * n_templates + t] for t in range(n_templates) for c in range(n_clauses)]
+            for l in range(len(RedFlagDetector.labels))
+        ]
+
+        combined_text = "".join(segments)
+        final_results, is_red_flag = RedFlagDetector.aggregate(combined_text, label_scores, threshold)
+        return final_results, is_red_flag, combined_text
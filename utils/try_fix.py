@@ -1,11 +1,15 @@
+import os
 import streamlit as st
 from PIL import Image
 import pytesseract
 from transformers import pipeline
 import time
+import uuid
 import torch
 import re
 
+from analysis_store import AnalysisStore
+
 # ----------------------------
 # CONFIG
 # ----------------------------
@@ -50,6 +54,17 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "model_loaded" not in st.session_state:
     st.session_state.model_loaded = False
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# ----------------------------
+# ANALYSIS STORE
+# ----------------------------
+@st.cache_resource
+def load_store():
+    return AnalysisStore(os.environ.get("CUPID_TRY_FIX_DB", "analysis_try_fix.db"))
+
+store = load_store()
 
 # ----------------------------
 # MODEL LOADER
@@ -170,10 +185,7 @@ with st.sidebar:
     st.divider()
 
     st.header("📊 Stats")
-    user_msgs = len([m for m in st.session_state.messages if m.get("role") == "user"])
-    red_flags = len([m for m in st.session_state.messages if m.get("is_red_flag")])
-    st.metric("Messages Analyzed", user_msgs)
-    st.metric("Red Flags Found", red_flags)
+    stats_container = st.container()
 
 # ----------------------------
 # LAYOUT
@@ -249,6 +261,8 @@ if analyze_clicked and (text_input or img_file):
                 "content": text_to_analyze[:200] + ("..." if len(text_to_analyze) > 200 else "")
             })
 
+            start = time.perf_counter()
+
             # 1) Toxicity
             tox_p = toxicity_probability(text_to_analyze)
 
@@ -272,6 +286,15 @@ if analyze_clicked and (text_input or img_file):
 
             avg_score = sum(scores.values()) / len(scores)
 
+            store.record(
+                st.session_state.session_id,
+                text_to_analyze,
+                scores.items(),
+                is_red_flag,
+                threshold,
+                (time.perf_counter() - start) * 1000,
+            )
+
             with results_container:
                 if is_red_flag:
                     st.markdown("<div class='red-flag'>🚩 RED FLAG DETECTED!</div>", unsafe_allow_html=True)
@@ -358,6 +381,16 @@ if analyze_clicked and (text_input or img_file):
                 "scores": scores
             })
 
+# ----------------------------
+# STATS (read after this run's analysis has been recorded)
+# ----------------------------
+with stats_container:
+    session_stats = store.session_stats(st.session_state.session_id)
+    totals = store.totals()
+    st.metric("Messages Analyzed", session_stats["analyses"])
+    st.metric("Red Flags Found", session_stats["red_flags"])
+    st.caption(f"All time: {totals['analyses']} analyzed, {totals['red_flags']} red flags")
+
 # ----------------------------
 # EXAMPLES
 # ----------------------------
@@ -403,6 +436,9 @@ with mid:
 with st.expander("🔧 Debug Info", expanded=False):
     st.write("Model loaded:", st.session_state.model_loaded)
     st.write("Session messages:", len(st.session_state.messages))
+    st.write("Analysis store:", store.path)
     if st.button("Clear History"):
         st.session_state.messages = []
+        # Start a new session so the sidebar stats reset; the stored history is kept
+        st.session_state.session_id = uuid.uuid4().hex
         st.rerun()
@@ -0,0 +1,232 @@
+import gc
+import os
+import atexit
+import sys
+import platform
+import time
+import threading
+import multiprocessing as mp
+
+import torch
+
+from utils.detector import RedFlagDetector
+
+# -----------------------------
+# Shared model (set in the pool host before forking)
+# -----------------------------
+# Workers are forked after the classifier is loaded, so they inherit its
+# weights copy-on-write instead of each loading their own ~1.7 GB copy.
+_classifier = None
+
+
+def _init_worker(counter, threads, cores):
+    global _classifier
+
+    # Give each worker its own slot: a thread share and a fixed set of cores
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+
+    torch.set_num_threads(threads)
+    if cores and hasattr(os, "sched_setaffinity"):
+        pinned = cores[slot * threads:(slot + 1) * threads]
+        if pinned:
+            os.sched_setaffinity(0, pinned)
+
+    # Without fork (Windows) each worker has to load its own copy
+    if _classifier is None:
+        _classifier = RedFlagDetector.load_classifier(device=-1)
+
+
+def _score_job(job):
+    return RedFlagDetector.score_job(_classifier, job)
+
+
+def _host_main(conn, workers, threads, cores):
+    """
+    Runs in a freshly spawned, single-threaded process: loads the model,
+    forks the workers from here and serves score requests sent over `conn`.
+    """
+    global _classifier
+
+    try:
+        if "fork" in mp.get_all_start_methods():
+            # Load in the host only; do not run a forward here, the intra-op
+            # thread pool is not fork-safe once it has been started. The pool
+            # is CPU-only: CUDA cannot be used again in a forked child.
+            _classifier = RedFlagDetector.load_classifier(device=-1)
+            _classifier.model.eval()
+
+            # Move everything allocated so far out of the GC's reach so that
+            # collections in the workers don't touch (and copy) the shared
+            # pages. This only affects the host process, which lives as long
+            # as the pool.
+            gc.collect()
+            gc.freeze()
+            ctx = mp.get_context("fork")
+        else:
+            ctx = mp.get_context("spawn")
+
+        counter = ctx.Value("i", 0)
+        pool = ctx.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(counter, threads, cores),
+        )
+    except Exception as e:
+        conn.send(("error", e))
+        return
+    conn.send(("ready", None))
+
+    try:
+        while True:
+            try:
+                jobs = conn.recv()
+            except EOFError:
+                break  # the owning process went away without close()
+            if jobs is None:
+                break
+            chunksize = max(1, len(jobs) // (workers * 4))
+            try:
+                conn.send(("ok", pool.map(_score_job, jobs, chunksize=chunksize)))
+            except Exception as e:
+                conn.send(("error", e))
+    finally:
+        pool.close()
+        pool.join()
+
+
+class ReplicaPool:
+    """
+    Runs `workers` inference processes that share one copy of the
+    zero-shot classifier's weights.
+
+    The pool lives in a separate host process started with `spawn`, so the
+    caller (e.g. the threaded Streamlit server) is never forked. The host
+    loads the model and forks the workers itself while it is still single
+    threaded; they inherit the weights copy-on-write. On platforms without
+    fork each worker loads its own copy.
+
+    Inference always runs on the CPU, even when a GPU is available. Each
+    worker gets `threads_per_worker` torch threads (default: an even share
+    of the CPUs) pinned to its own cores where the OS allows it.
+    """
+
+    def __init__(self, workers=None, threads_per_worker=None):
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        cpu_count = len(cores) or os.cpu_count() or 1
+
+        self.workers = workers or cpu_count
+        self.threads_per_worker = threads_per_worker or max(1, cpu_count // self.workers)
+
+        ctx = mp.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._host = ctx.Process(
+            target=_host_main,
+            args=(child_conn, self.workers, self.threads_per_worker, cores),
+            daemon=False,
+        )
+        self._host.start()
+        child_conn.close()
+
+        # Requests from different script-runner threads share one pipe
+        self._lock = threading.Lock()
+
+        status, error = self._conn.recv()
+        if status == "error":
+            self._host.join()
+            raise error
+
+        # Cached pools (app.py) are never closed explicitly; without this the
+        # interpreter would wait on the host forever at exit
+        atexit.register(self.close)
+
+    def score(self, jobs):
+        # Results come back in job order, same as the sequential loop
+        with self._lock:
+            self._conn.send(list(jobs))
+            status, result = self._conn.recv()
+        if status == "error":
+            raise result
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._host is None:
+                return
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass  # host already gone
+            self._host.join()
+            self._conn.close()
+            self._host = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------
+# Scaling benchmark
+# -----------------------------
+def benchmark(prompts, worker_counts, threshold=0.3, repeats=1):
+    """
+    Throughput of RedFlagDetector.get_results against worker count.
+    Returns a list of (workers, prompts/sec, forwards/sec) rows.
+    """
+    n_forwards = sum(
+        len(RedFlagDetector.make_jobs(RedFlagDetector.split_clauses(p))) for p in prompts
+    ) * repeats
+
+    rows = []
+    for workers in worker_counts:
+        with ReplicaPool(workers) as pool:
+            # Warm-up so model paging/thread start-up isn't timed
+            RedFlagDetector.get_results(prompts[0], threshold, pool=pool)
+
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for prompt in prompts:
+                    RedFlagDetector.get_results(prompt, threshold, pool=pool)
+            elapsed = time.perf_counter() - start
+
+        rows.append((workers, len(prompts) * repeats / elapsed, n_forwards / elapsed))
+    return rows
+
+
+def cpu_model():
+    # platform.processor() is often empty on Linux
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+if __name__ == "__main__":
+    # python -m utils.worker_pool [max_workers] > table.md
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    counts = sorted({1, max_workers} | {2 ** i for i in range(max_workers.bit_length()) if 2 ** i <= max_workers})
+
+    sample_prompts = [
+        "Hey! Would you like to grab coffee sometime? I'd love to get to know you better.",
+        "You're the only one who understands me. I can't live without you. Why haven't you replied?",
+        "Just because I cheated and got someone else pregnant doesn't mean I don't wanna be with you.",
+    ]
+
+    rows = benchmark(sample_prompts, counts)
+    base = rows[0][1]
+
+    # Markdown, ready to paste into the README with the hardware it ran on
+    print(f"{cpu_model()}, {os.cpu_count()} logical CPUs, torch {torch.__version__}, Python {platform.python_version()}")
+    print()
+    print("| workers | prompts/s | forwards/s | speedup |")
+    print("|--------:|----------:|-----------:|--------:|")
+    for workers, prompts_per_s, forwards_per_s in rows:
+        print(f"| {workers} | {prompts_per_s:.2f} | {forwards_per_s:.1f} | {prompts_per_s / base:.2f}x |")